@@ -0,0 +1,81 @@
+"""Benchmark local de circulación (préstamos + devoluciones) en modo particionado.
+
+Compara una `Library` en un solo proceso con `ShardedLibrary` usando distinto
+número de procesos de trabajo. Ejemplo:
+
+    python bench_shards.py --workers 1 2 4 8 --ops 200000
+
+El escalamiento depende de los núcleos disponibles: con un solo núcleo los
+shards compiten por la misma CPU y no se observa mejora.
+"""
+import argparse
+import os
+import random
+import time
+from typing import List, Tuple
+
+from library_shards import ShardedLibrary
+from library_system import Library
+
+
+def make_workload(ops: int, books: int, users: int, seed: int) -> List[Tuple[int, int]]:
+    rng = random.Random(seed)
+    return [(rng.randint(1, users), rng.randint(1, books)) for _ in range(ops // 2)]
+
+
+def bench_single(pairs: List[Tuple[int, int]], books: int, users: int) -> float:
+    lib = Library()
+    for i in range(books):
+        lib.add_book(f"Libro {i}", "Autor", 2000, copies=2)
+    for i in range(users):
+        lib.add_user(f"Usuario {i}")
+    start = time.perf_counter()
+    for u, b in pairs:
+        lib.borrow_book(u, b)
+    for u, b in pairs:
+        lib.return_book(u, b)
+    return time.perf_counter() - start
+
+
+def bench_sharded(pairs: List[Tuple[int, int]], books: int, users: int,
+                  workers: int, batch: int) -> Tuple[float, float]:
+    """Retorna (tiempo real, tiempo de CPU del coordinador)."""
+    with ShardedLibrary(workers) as lib:
+        for i in range(books):
+            lib.add_book(f"Libro {i}", "Autor", 2000, copies=2)
+        for i in range(users):
+            lib.add_user(f"Usuario {i}")
+        start, cpu_start = time.perf_counter(), time.process_time()
+        for i in range(0, len(pairs), batch):
+            lib.borrow_many(pairs[i:i + batch])
+        for i in range(0, len(pairs), batch):
+            lib.return_many(pairs[i:i + batch])
+        return time.perf_counter() - start, time.process_time() - cpu_start
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Throughput de circulación por número de shards.")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--ops", type=int, default=100000, help="Total de préstamos + devoluciones.")
+    parser.add_argument("--books", type=int, default=5000)
+    parser.add_argument("--users", type=int, default=2000)
+    parser.add_argument("--batch", type=int, default=2000, help="Operaciones por lote enviado a los shards.")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    pairs = make_workload(args.ops, args.books, args.users, args.seed)
+    total = 2 * len(pairs)
+    print(f"CPUs: {os.cpu_count()} | operaciones: {total} | lote: {args.batch}")
+
+    elapsed = bench_single(pairs, args.books, args.users)
+    print(f"{'1 proceso (Library)':<22} {total / elapsed:>12,.0f} ops/s")
+    # El techo del coordinador (operaciones / su propio tiempo de CPU) acota el
+    # throughput sin importar cuántos núcleos tengan los shards.
+    for workers in args.workers:
+        elapsed, coordinator_cpu = bench_sharded(pairs, args.books, args.users, workers, args.batch)
+        print(f"{f'{workers} shard(s)':<22} {total / elapsed:>12,.0f} ops/s"
+              f"   (techo del coordinador: {total / coordinator_cpu:,.0f} ops/s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,161 @@
+"""Verificación de library_cli.py y de los índices perezosos de Library.
+
+Ejecuta la CLI como subproceso sobre archivos temporales y comprueba las
+salidas y los códigos de retorno:
+
+    python check_cli.py
+"""
+import json
+import os
+import subprocess
+import sys
+import tempfile
+from typing import List, Tuple
+
+from library_cli import save_atomic
+from library_system import Library
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+CLI = os.path.join(HERE, "library_cli.py")
+
+
+def run(args: List[str], stdin: str = "") -> Tuple[int, List[dict], str]:
+    proc = subprocess.run([sys.executable, CLI] + args, input=stdin, capture_output=True,
+                          text=True, encoding="utf-8", cwd=HERE)
+    records = [json.loads(line) for line in proc.stdout.splitlines() if line]
+    return proc.returncode, records, proc.stderr
+
+
+def write_fixture(path: str) -> None:
+    lib = Library()
+    lib.add_book("Estructuras de Datos en Python", "Zahonero & Joyanes", 2008, copies=2)
+    lib.add_book("Algoritmos y Programación", "Ayala San Martín", 2020, copies=1)
+    lib.add_user("Camilo Esguerra")
+    lib.add_user("Ana Pérez")
+    lib.save_to_json(path)
+
+
+def tree_height(node) -> int:
+    return 0 if node is None else 1 + max(tree_height(node.left), tree_height(node.right))
+
+
+def check_lazy_indexes() -> None:
+    lib = Library()
+    for i in range(1023):
+        lib.add_book(f"Libro {i:04d}", "Autor", 2000)
+    assert lib._book_bst is None and lib._book_title_bst is None, "índices construidos antes de usarse"
+    assert lib._find_book(500).title == "Libro 0499"
+    assert lib._book_title_bst is None, "buscar por ID no debe construir el índice por título"
+    assert tree_height(lib.book_bst.root) == 10, "el índice por ID debe quedar balanceado"
+    assert tree_height(lib.book_title_bst.root) == 10, "el índice por título debe quedar balanceado"
+    # Con el índice ya construido, add_book lo actualiza en lugar de reconstruirlo
+    book = lib.add_book("Zeta", "Autor", 2001)
+    assert lib.search_by_title_exact("Zeta") is book and lib._find_book(book.id) is book
+
+    # Títulos repetidos: el orden por título conserva el orden de alta y la
+    # búsqueda exacta retorna el libro agregado primero
+    lib = Library()
+    for i in range(5):
+        lib.add_book("Same", "Autor", 2000 + i)
+    lib.add_book("Otro", "Autor", 2000)
+    assert [b.id for b in lib.book_title_bst.inorder()] == [6, 1, 2, 3, 4, 5]
+    assert lib.search_by_title_exact("same").id == 1
+    assert [b.id for b in lib.search_by_title_prefix("sa")] == [1, 2, 3, 4, 5]
+    lib.add_book("same", "Autor", 2010)  # inserción sobre el índice ya construido
+    assert [b.id for b in lib.search_by_title_prefix("SAME")] == [1, 2, 3, 4, 5, 7]
+
+
+def check_cli(tmp: str) -> None:
+    data = os.path.join(tmp, "biblioteca.json")
+    write_fixture(data)
+
+    # remove_book seguido de find_title: el índice por título no debe devolver el libro eliminado
+    cmds = "\n".join(json.dumps(c) for c in [
+        {"cmd": "find_title", "title": "Algoritmos y Programación"},
+        {"cmd": "remove_book", "book_id": 2},
+        {"cmd": "find_title", "title": "Algoritmos y Programación"},
+    ])
+    code, out, _ = run(["--data", data, "--commands", "-"], cmds)
+    assert code == 0 and out[0]["result"]["id"] == 2 and out[2]["result"] is None, out
+
+    # Líneas defectuosas producen registros de error y el lote continúa y se guarda
+    cmds = "\n".join([
+        json.dumps({"cmd": "add_user", "name": "Luis"}),
+        json.dumps({"cmd": "search", "keyword": 5}),
+        json.dumps({"cmd": ["x"]}),
+        json.dumps({"cmd": "borrow", "user_id": "a", "book_id": 1}),
+        json.dumps({"cmd": "borrow", "user_id": 1}),
+        json.dumps({"cmd": "borrow", "user_id": 1, "book_id": 1, "extra": 0}),
+        "{no es json",
+        "[1, 2]",
+        json.dumps({"cmd": "borrow", "user_id": 3, "book_id": 1}),
+    ])
+    code, out, _ = run(["--data", data, "--commands", "-"], cmds)
+    assert code == 0 and len(out) == 9, out
+    assert all("error" in r for r in out[1:8]), out
+    assert out[8]["result"].startswith("Préstamo exitoso"), out
+    code, out, _ = run(["--data", data, "find_user", "3"])
+    assert out[0]["result"] == {"id": 3, "name": "Luis", "borrowed": [1]}, out
+
+    # undo sin operaciones en el lote no modifica datos ni reescribe el archivo
+    mtime = os.stat(data).st_mtime_ns
+    code, out, _ = run(["--data", data, "undo"])
+    assert code == 0 and out[0]["result"] == "No hay operaciones para deshacer.", out
+    assert os.stat(data).st_mtime_ns == mtime, "undo sin efecto reescribió el archivo"
+    cmds = "\n".join(json.dumps(c) for c in [
+        {"cmd": "borrow", "user_id": 1, "book_id": 1},
+        {"cmd": "undo"},
+    ])
+    code, out, _ = run(["--data", data, "--commands", "-"], cmds)
+    assert out[1]["result"].startswith("Se deshizo"), out
+
+    # Opciones después del comando se respetan; argumentos sobrantes se rechazan
+    code, out, err = run(["--data", data, "find_user", "1", "--stats"])
+    assert code == 0 and out[0]["result"]["id"] == 1 and "startup_ms" in err, err
+    code, out, err = run(["--data", data, "find_user", "1", "2"])
+    assert code == 2 and not out and "Demasiados argumentos" in err, err
+    code, out, err = run(["--data", data, "nada"])
+    assert code == 2 and "Comando desconocido" in err, err
+
+    # Archivo de comandos inexistente: error limpio, sin traceback
+    code, out, err = run(["--data", data, "--commands", os.path.join(tmp, "no_existe.jsonl")])
+    assert code == 2 and "Traceback" not in err, err
+
+    # Archivo de datos inexistente: se parte de una biblioteca vacía
+    fresh = os.path.join(tmp, "nueva.json")
+    code, out, _ = run(["--data", fresh, "add_user", "Bob"])
+    assert code == 0 and out[0]["result"]["id"] == 1 and os.path.exists(fresh)
+
+    # Guardado atómico: si la escritura falla a mitad, el archivo anterior queda
+    # intacto y no quedan temporales
+    with open(data, encoding="utf-8") as f:
+        before = f.read()
+    lib = Library()
+    lib.load_from_json(data)
+    lib.add_book("Libro", "Autor", 2000).title = object()  # no serializable
+    assert save_atomic(lib, data).startswith("Error")
+    with open(data, encoding="utf-8") as f:
+        assert f.read() == before, "un guardado fallido modificó el archivo"
+    assert not [f for f in os.listdir(tmp) if f.endswith(".tmp")], os.listdir(tmp)
+
+    # Archivo de datos corrupto: código distinto de cero y el archivo no se toca
+    bad = os.path.join(tmp, "bad.json")
+    with open(data, encoding="utf-8") as f:
+        content = f.read()[:-40]
+    with open(bad, "w", encoding="utf-8") as f:
+        f.write(content)
+    code, out, err = run(["--data", bad, "add_user", "Bob"])
+    assert code == 1 and not out and "Error al cargar" in err, err
+    with open(bad, encoding="utf-8") as f:
+        assert f.read() == content, "el archivo corrupto fue sobrescrito"
+
+
+def main() -> None:
+    check_lazy_indexes()
+    with tempfile.TemporaryDirectory() as tmp:
+        check_cli(tmp)
+    print("check_cli: OK")
+
+
+if __name__ == "__main__":
+    main()
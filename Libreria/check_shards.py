@@ -0,0 +1,157 @@
+"""Verificación de ShardedLibrary contra una Library de un solo proceso.
+
+Aplica los mismos lotes de préstamos y devoluciones (con usuarios y libros
+inexistentes para forzar abortos, libros de una sola copia para ejercitar las
+listas de espera, y rebalanceos intermedios) y compara mensajes y estado:
+
+    python check_shards.py
+"""
+import random
+from typing import List, Tuple
+
+from library_shards import HashPartitioner, RangePartitioner, ShardedLibrary
+from library_system import Library
+
+
+def seed(lib: Library, rng: random.Random, books: int, users: int) -> None:
+    for i in range(books):
+        # Títulos repetidos (con distinta capitalización) para el desempate por ID
+        title = f"Libro {i % 10:03d}" if i % 3 else f"LIBRO {i % 10:03d}"
+        lib.add_book(title, f"Autor {i % 7}", 2000 + i % 20, copies=rng.choice([0, 1, 1, 2]))
+    for i in range(users):
+        lib.add_user(f"Usuario {i}")
+
+
+def compare_state(ref: Library, sharded: ShardedLibrary, where: str) -> None:
+    assert ref.list_books() == sharded.list_books(), f"{where}: list_books"
+    assert ref.list_users() == sharded.list_users(), f"{where}: list_users"
+    assert ref.list_books_ordered_by_id() == sharded.list_books_ordered_by_id(), f"{where}: por ID"
+    assert ref.list_books_ordered_by_title() == sharded.list_books_ordered_by_title(), f"{where}: por título"
+    assert ref.list_users_ordered() == sharded.list_users_ordered(), f"{where}: usuarios ordenados"
+    for prefix in ("libro 00", "LIBRO 0"):
+        expected = [b.id for b in ref.search_by_title_prefix(prefix)]
+        assert expected == [b.id for b in sharded.search_by_title_prefix(prefix)], f"{where}: prefijo"
+    expected, got = ref.search_by_title_exact("libro 003"), sharded.search_by_title_exact("libro 003")
+    assert (expected and expected.id) == (got and got.id), f"{where}: título exacto"
+
+
+def check_known_cases() -> None:
+    """Casos reportados en revisión: abortos y listas de espera dentro de un lote."""
+    for partitioner in (HashPartitioner(2), RangePartitioner([3])):
+        ref = Library()
+        with ShardedLibrary(partitioner=partitioner) as sharded:
+            for lib in (ref, sharded):
+                for i in range(4):
+                    lib.add_book(f"L{i}", "A", 2000, copies=1)
+                for i in range(4):
+                    lib.add_user(f"U{i}")
+            steps: List[Tuple[str, List[Tuple[int, int]]]] = [
+                ("borrow", [(99, 2), (2, 2)]),        # aborto seguido de préstamo del mismo libro
+                ("borrow", [(4, 2), (1, 2), (4, 2)]),  # cola de espera y usuario ya en espera
+                ("return", [(2, 2), (4, 2)]),          # préstamo automático y devolución inmediata
+                ("return", [(1, 2), (3, 99), (99, 1), (3, 1)]),
+            ]
+            for kind, pairs in steps:
+                op = ref.borrow_book if kind == "borrow" else ref.return_book
+                expected = [op(u, b) for u, b in pairs]
+                got = (sharded.borrow_many if kind == "borrow" else sharded.return_many)(pairs)
+                assert expected == got, (kind, pairs, expected, got)
+                compare_state(ref, sharded, f"{kind} {pairs}")
+
+    # Préstamo automático a un usuario cuyo shard (recién creado por el
+    # rebalanceo) no participa en el lote
+    ref = Library()
+    with ShardedLibrary(partitioner=HashPartitioner(3)) as sharded:
+        for lib in (ref, sharded):
+            for i in range(4):
+                lib.add_book(f"L{i}", "A", 2000, copies=1)
+                lib.add_user(f"U{i}")
+        for u, b in [(1, 1), (3, 1)]:
+            assert ref.borrow_book(u, b) == sharded.borrow_book(u, b)
+        sharded.rebalance(HashPartitioner(4))
+        assert [ref.return_book(1, 1)] == sharded.return_many([(1, 1)])
+        compare_state(ref, sharded, "préstamo automático a un shard sin pares")
+
+
+def check_random_batches(seed_value: int, rounds: int = 60) -> None:
+    rng = random.Random(seed_value)
+    books, users = 25, 15
+    ref = Library()
+    with ShardedLibrary(3) as sharded:
+        seed(ref, rng, books, users)
+        for b in ref.books:  # mismo catálogo (y copias) en ambos
+            sharded.add_book(b.title, b.author, b.year, b.copies)
+        for u in ref.users:
+            sharded.add_user(u.name)
+
+        partitioners = [HashPartitioner(2), RangePartitioner([8, 16]), HashPartitioner(4), HashPartitioner(1)]
+        for step in range(rounds):
+            size = rng.randint(1, 40)
+            # IDs fuera de rango producen usuarios/libros inexistentes (abortos)
+            pairs = [(rng.randint(0, users + 2), rng.randint(0, books + 2)) for _ in range(size)]
+            if rng.random() < 0.5:
+                expected = [ref.borrow_book(u, b) for u, b in pairs]
+                got = sharded.borrow_many(pairs)
+            else:
+                # Devoluciones mayormente válidas: pares tomados de préstamos vigentes
+                loans = [(u.id, b) for u in ref.users for b in u.borrowed]
+                pairs = [rng.choice(loans) if loans and rng.random() < 0.8 else p for p in pairs]
+                expected = [ref.return_book(u, b) for u, b in pairs]
+                got = sharded.return_many(pairs)
+            assert expected == got, (seed_value, step, pairs, expected, got)
+            compare_state(ref, sharded, f"semilla {seed_value}, paso {step}")
+            if step % 15 == 14:
+                sharded.rebalance(partitioners[(step // 15) % len(partitioners)])
+                compare_state(ref, sharded, f"rebalanceo en paso {step}")
+
+
+def check_worker_errors() -> None:
+    with ShardedLibrary(2) as sharded:
+        for i in range(4):
+            sharded.add_book(f"Libro {i}", "Autor", 2000)
+            sharded.add_user(f"Usuario {i}")
+        try:
+            sharded.search_books(None)  # type: ignore[arg-type]
+        except AttributeError:
+            pass
+        else:
+            raise AssertionError("la excepción del shard debe llegar al llamador")
+        assert sharded.borrow_book(1, 1).startswith("Préstamo exitoso")
+
+        dead = sharded.partitioner.shard_for(1)
+        alive_book = next(b for b in range(1, 5) if sharded.partitioner.shard_for(b) != dead)
+        sharded._procs[dead].kill()
+        sharded._procs[dead].join()
+        # Voto fallido: el shard vivo del libro no presta ni encola
+        for _ in range(2):
+            try:
+                sharded.borrow_many([(1, alive_book)])
+            except RuntimeError:
+                pass
+            else:
+                raise AssertionError("el préstamo con un shard caído debe fallar")
+            book = sharded.find_book(alive_book)
+            assert book.copies == 1 and not book.waitlist, "el préstamo se decidió sin el voto del usuario"
+        # Tras el error, las llamadas a los shards vivos no leen respuestas viejas
+        for _ in range(2):
+            try:
+                sharded.list_books()
+            except RuntimeError:
+                pass
+            else:
+                raise AssertionError("el listado con un shard caído debe fallar")
+        assert sharded.find_book(alive_book).id == alive_book
+        assert sharded.find_user(alive_book).id == alive_book
+    # close() (vía __exit__) tolera el proceso muerto
+
+
+def main() -> None:
+    check_known_cases()
+    for seed_value in range(5):
+        check_random_batches(seed_value)
+    check_worker_errors()
+    print("check_shards: OK")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,266 @@
+"""CLI no interactiva (por lotes) para el sistema de biblioteca.
+
+Ejecuta comandos desde argv, stdin o un archivo JSONL contra una biblioteca
+persistida en JSON, y emite un resultado JSON por línea. Ejemplos:
+
+    python library_cli.py --data biblioteca.json borrow 1 2
+    python library_cli.py --data biblioteca.json --commands ops.jsonl
+    cat ops.jsonl | python library_cli.py --data biblioteca.json --commands -
+
+Cada línea del archivo de comandos es un objeto JSON, por ejemplo:
+    {"cmd": "borrow", "user_id": 1, "book_id": 2}
+
+Los índices BST de Library se construyen bajo demanda, así que un lote que
+sólo presta/devuelve no paga la construcción del índice por título.
+"""
+import time
+
+_T0 = time.perf_counter()
+
+import argparse
+import json
+import os
+import sys
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+from library_system import Book, Library, User
+
+
+# ---------- Serialización de resultados ----------
+
+def book_to_dict(b: Book) -> Dict[str, Any]:
+    return {"id": b.id, "title": b.title, "author": b.author, "year": b.year,
+            "copies": b.copies, "waitlist": list(b.waitlist)}
+
+
+def user_to_dict(u: User) -> Dict[str, Any]:
+    return {"id": u.id, "name": u.name, "borrowed": list(u.borrowed)}
+
+
+# ---------- Comandos ----------
+# Cada comando: (función, parámetros en orden posicional, ¿modifica datos?).
+# El tercer campo puede ser una función que decide a partir del resultado.
+
+def _list_books(lib: Library, order: str = "") -> List[Dict[str, Any]]:
+    if order == "id":
+        books = lib.book_bst.inorder()
+    elif order == "title":
+        books = lib.book_title_bst.inorder()
+    else:
+        books = lib.books
+    return [book_to_dict(b) for b in books]
+
+
+def _list_users(lib: Library, order: str = "") -> List[Dict[str, Any]]:
+    users = lib.user_bst.inorder() if order == "id" else lib.users
+    return [user_to_dict(u) for u in users]
+
+
+def _add_book(lib: Library, title: str, author: str, year: int, copies: int = 1) -> Dict[str, Any]:
+    return book_to_dict(lib.add_book(title, author, year, copies))
+
+
+def _add_user(lib: Library, name: str) -> Dict[str, Any]:
+    return user_to_dict(lib.add_user(name))
+
+
+def _find_book(lib: Library, book_id: int) -> Optional[Dict[str, Any]]:
+    book = lib._find_book(book_id)
+    return book_to_dict(book) if book else None
+
+
+def _find_user(lib: Library, user_id: int) -> Optional[Dict[str, Any]]:
+    user = lib._find_user(user_id)
+    return user_to_dict(user) if user else None
+
+
+def _find_title(lib: Library, title: str) -> Optional[Dict[str, Any]]:
+    book = lib.search_by_title_exact(title)
+    return book_to_dict(book) if book else None
+
+
+COMMANDS: Dict[str, Tuple[Callable[..., Any], Tuple[str, ...], Union[bool, Callable[[Any], bool]]]] = {
+    "list_books": (_list_books, ("order",), False),
+    "list_users": (_list_users, ("order",), False),
+    "add_book": (_add_book, ("title", "author", "year", "copies"), True),
+    "remove_book": (lambda lib, book_id: lib.remove_book(book_id), ("book_id",), True),
+    "add_user": (_add_user, ("name",), True),
+    "borrow": (lambda lib, user_id, book_id: lib.borrow_book(user_id, book_id),
+               ("user_id", "book_id"), True),
+    "return": (lambda lib, user_id, book_id: lib.return_book(user_id, book_id),
+               ("user_id", "book_id"), True),
+    # La pila de deshacer no se persiste: undo sólo revierte operaciones del
+    # mismo lote, y si no hay nada que deshacer el archivo no se reescribe.
+    "undo": (lambda lib: lib.undo_last(), (), lambda result: result.startswith("Se deshizo")),
+    "search": (lambda lib, keyword: [book_to_dict(b) for b in lib.search_books(keyword)],
+               ("keyword",), False),
+    "find_book": (_find_book, ("book_id",), False),
+    "find_title": (_find_title, ("title",), False),
+    "title_prefix": (lambda lib, prefix: [book_to_dict(b) for b in lib.search_by_title_prefix(prefix)],
+                     ("prefix",), False),
+    "find_user": (_find_user, ("user_id",), False),
+}
+
+
+# Parámetros enteros; el resto deben ser cadenas
+INT_PARAMS = {"user_id", "book_id", "year", "copies"}
+
+
+def _check_arg(param: str, value: Any) -> Any:
+    """Valida (y convierte si viene como texto) el valor de un parámetro."""
+    if param in INT_PARAMS:
+        if isinstance(value, int) and not isinstance(value, bool):
+            return value
+        if isinstance(value, str):
+            try:
+                return int(value)
+            except ValueError:
+                pass
+        raise ValueError(f"'{param}' debe ser un entero.")
+    if not isinstance(value, str):
+        raise ValueError(f"'{param}' debe ser texto.")
+    return value
+
+
+def parse_argv_command(tokens: List[str]) -> Dict[str, Any]:
+    """Convierte `cmd arg1 arg2 ...` en el mismo dict que usa el formato JSONL."""
+    name, args = tokens[0], tokens[1:]
+    if name not in COMMANDS:
+        raise ValueError(f"Comando desconocido: {name}")
+    params = COMMANDS[name][1]
+    if len(args) > len(params):
+        raise ValueError(f"Demasiados argumentos para '{name}': {' '.join(args[len(params):])}")
+    cmd: Dict[str, Any] = {"cmd": name}
+    cmd.update(zip(params, args))
+    return cmd
+
+
+def read_commands(lines: Iterable[str]) -> Iterator[Dict[str, Any]]:
+    """Lee comandos JSONL; las líneas vacías o que empiezan con '#' se ignoran."""
+    for line in lines:
+        line = line.strip()
+        if not line or line.startswith("#"):
+            continue
+        try:
+            cmd = json.loads(line)
+        except ValueError as e:
+            yield {"cmd": None, "_error": f"JSON inválido: {e}"}
+            continue
+        if not isinstance(cmd, dict):
+            cmd = {"cmd": None, "_error": "Cada línea debe ser un objeto JSON."}
+        yield cmd
+
+
+def run_command(lib: Library, cmd: Dict[str, Any]) -> Tuple[Dict[str, Any], bool]:
+    """Ejecuta un comando y devuelve (registro de salida, ¿modificó datos?)."""
+    name = cmd.get("cmd")
+    if "_error" in cmd:
+        return {"cmd": name, "error": cmd["_error"]}, False
+    spec = COMMANDS.get(name) if isinstance(name, str) else None
+    if spec is None:
+        return {"cmd": name, "error": "Comando desconocido."}, False
+    func, params, mutates = spec
+    extra = sorted(k for k in cmd if k != "cmd" and k not in params)
+    if extra:
+        return {"cmd": name, "error": f"Argumentos desconocidos: {', '.join(extra)}"}, False
+    try:
+        kwargs = {k: _check_arg(k, cmd[k]) for k in params if k in cmd}
+        result = func(lib, **kwargs)
+    except (TypeError, ValueError) as e:
+        return {"cmd": name, "error": f"Argumentos inválidos: {e}"}, False
+    except Exception as e:
+        # Un comando defectuoso no debe detener el lote ni perder los cambios previos
+        return {"cmd": name, "error": f"Error: {e}"}, False
+    return {"cmd": name, "result": result}, mutates(result) if callable(mutates) else mutates
+
+
+def save_atomic(lib: Library, path: str) -> str:
+    """Guarda en un temporal del mismo directorio y lo renombra sobre `path`.
+
+    Si el proceso muere a mitad de la escritura, el archivo original queda intacto.
+    """
+    tmp = f"{path}.{os.getpid()}.tmp"
+    msg = lib.save_to_json(tmp)
+    if not msg.startswith("Error"):
+        try:
+            os.replace(tmp, path)
+            return f"Datos guardados exitosamente en '{path}'."
+        except OSError as e:
+            msg = f"Error al guardar: {str(e)}"
+    if os.path.exists(tmp):
+        os.remove(tmp)
+    return msg
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Biblioteca: ejecución de comandos por lotes.")
+    parser.add_argument("--data", required=True, help="Archivo JSON de la biblioteca.")
+    parser.add_argument("--commands", type=argparse.FileType("r", encoding="utf-8"),
+                        help="Archivo JSONL de comandos ('-' para stdin).")
+    parser.add_argument("--no-save", action="store_true", help="No guardar los cambios al terminar.")
+    parser.add_argument("--stats", action="store_true", help="Imprime tiempos de arranque/ejecución en stderr.")
+    parser.add_argument("command", nargs="*", help="Comando y argumentos (ej: borrow 1 2).")
+    args = parser.parse_intermixed_args(argv)
+
+    argv_command: Optional[Dict[str, Any]] = None
+    if args.command:
+        if args.commands is not None:
+            parser.error("use un comando en la línea o --commands, no ambos.")
+        try:
+            argv_command = parse_argv_command(args.command)
+        except ValueError as e:
+            parser.error(str(e))
+
+    lib = Library()
+    t_load = time.perf_counter()
+    # Sólo un archivo inexistente equivale a una biblioteca vacía; si existe y
+    # no se puede cargar, se aborta sin guardar para no sobrescribirlo.
+    if os.path.exists(args.data):
+        msg = lib.load_from_json(args.data)
+        if msg.startswith("Error"):
+            print(msg, file=sys.stderr)
+            if args.commands is not None and args.commands is not sys.stdin:
+                args.commands.close()
+            return 1
+    t_ready = time.perf_counter()
+
+    if argv_command is not None:
+        commands: Iterable[Dict[str, Any]] = [argv_command]
+        source = None
+    else:
+        source = args.commands or sys.stdin
+        commands = read_commands(source)
+
+    out = sys.stdout
+    dumps = json.dumps
+    count = 0
+    dirty = False
+    for cmd in commands:
+        record, mutated = run_command(lib, cmd)
+        out.write(dumps(record, ensure_ascii=False) + "\n")
+        dirty = dirty or mutated
+        count += 1
+    out.flush()
+    if source is not None and source is not sys.stdin:
+        source.close()
+
+    if dirty and not args.no_save:
+        msg = save_atomic(lib, args.data)
+        if msg.startswith("Error"):
+            print(msg, file=sys.stderr)
+            return 1
+
+    if args.stats:
+        t_end = time.perf_counter()
+        stats = {
+            "startup_ms": round((t_load - _T0) * 1000, 3),
+            "load_ms": round((t_ready - t_load) * 1000, 3),
+            "run_ms": round((t_end - t_ready) * 1000, 3),
+            "commands": count,
+        }
+        print(json.dumps(stats), file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,635 @@
+"""Modo particionado (sharded) del sistema de biblioteca.
+
+Libros y usuarios se reparten por ID (hash o rango) entre procesos de trabajo;
+cada proceso es dueño de su propia `Library`. Un coordinador (`ShardedLibrary`)
+enruta préstamos y devoluciones al shard dueño y, cuando usuario y libro viven
+en shards distintos, usa un protocolo de dos fases:
+
+1. Votar: el shard del usuario envía al shard del libro si el usuario
+   existe y, en devoluciones, cuántas copias del libro tiene.
+2. Decidir: el shard del libro presta, encola o registra la devolución (o
+   la rechaza) y envía la decisión al shard del usuario, que la aplica al
+   terminar el lote.
+
+Los listados y búsquedas se reparten a todos los shards y se combinan. Los
+lotes se ejecutan por rondas con un solo mensaje por shard y ronda: los
+votos y decisiones viajan entre shards a través del coordinador, que sólo
+los reenvía, de modo que los shards trabajan en paralelo. `undo_last` no
+está soportado: la pila de deshacer es global y no tiene sentido entre
+procesos.
+"""
+from array import array
+from bisect import bisect_right
+import heapq
+import pickle
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+import multiprocessing as mp
+
+from library_system import Book, Library, Operation, User
+
+
+# ---------- Particionadores ----------
+
+class HashPartitioner:
+    """Asigna cada ID al shard `id % num_shards`."""
+    def __init__(self, num_shards: int) -> None:
+        if num_shards < 1:
+            raise ValueError("Se necesita al menos un shard.")
+        self.num_shards = num_shards
+
+    def shard_for(self, key: int) -> int:
+        return key % self.num_shards
+
+    def shards_for(self, keys: Sequence[int]) -> List[int]:
+        """`shard_for` de todo un lote en una sola pasada."""
+        n = self.num_shards
+        return [key % n for key in keys]
+
+
+class RangePartitioner:
+    """Asigna rangos contiguos de IDs: `bounds` son los límites superiores
+    (exclusivos) de cada shard salvo el último, que queda abierto."""
+    def __init__(self, bounds: Sequence[int]) -> None:
+        self.bounds = sorted(bounds)
+        self.num_shards = len(self.bounds) + 1
+
+    def shard_for(self, key: int) -> int:
+        return bisect_right(self.bounds, key)
+
+    def shards_for(self, keys: Sequence[int]) -> List[int]:
+        """`shard_for` de todo un lote en una sola pasada."""
+        bounds = self.bounds
+        return [bisect_right(bounds, key) for key in keys]
+
+
+# ---------- Proceso de trabajo (shard) ----------
+
+def _return_message(next_user: Optional[int]) -> str:
+    """Mismo texto que `Library.return_book` para una devolución registrada."""
+    if next_user is not None:
+        return f"Devolución registrada. Se prestó automáticamente a usuario en espera (ID {next_user})."
+    return "Devolución registrada."
+
+
+class ShardWorker:
+    """Operaciones que un shard ejecuta sobre su `Library` local.
+
+    En un lote, cada par lo decide el shard de su libro con el voto del shard
+    de su usuario. Los cambios en `user.borrowed` (préstamos, devoluciones y
+    préstamos automáticos) quedan en `staged` con el índice de su par y
+    `flush` los aplica al final en el orden del lote, así que los votos se
+    calculan sobre el estado inicial y los pares de un mismo usuario no
+    dependen entre sí.
+    """
+    def __init__(self) -> None:
+        self.lib = Library()
+        self.staged: Dict[int, List[Tuple[int, bool, int]]] = {}  # usuario -> [(txn, ¿presta?, libro)]
+        # Lote en curso (ver `begin`); un shard sin pares en el lote sólo recibe decisiones
+        self.batch: Tuple[Sequence[int], Sequence[int]] = ((), ())
+        self.user_side: Sequence[int] = ()
+        self.book_side: Sequence[int] = ()
+        self.votes: Dict[int, Any] = {}  # txn -> voto del lado del usuario
+
+    # Altas
+    def add_book(self, book_id: int, title: str, author: str, year: int, copies: int) -> Book:
+        self.lib.next_book_id = book_id  # el coordinador asigna los IDs globales
+        return self.lib.add_book(title, author, year, copies)
+
+    def add_user(self, user_id: int, name: str) -> User:
+        self.lib.next_user_id = user_id
+        return self.lib.add_user(name)
+
+    # Lotes: `begin` recibe el lote completo y cada `step` ejecuta una ronda
+    def begin(self, shard: int, partitioner: Any, returns: bool, user_side: Sequence[int],
+              book_side: Sequence[int], user_ids: Sequence[int], book_ids: Sequence[int]) -> None:
+        """Recibe el lote y los índices de los pares cuyo usuario (`user_side`)
+        o libro (`book_side`) vive en este shard, en el orden del lote."""
+        self.shard = shard
+        self.partitioner = partitioner
+        self.returns = returns
+        self.batch = (user_ids, book_ids)
+        self.user_side = user_side
+        self.book_side = book_side
+
+    def step(self, inbox: List[bytes], final: bool) -> Tuple[Sequence[int], List[str], Dict[int, bytes], bool]:
+        """Una ronda del lote.
+
+        Aplica lo que otros shards enviaron en la ronda anterior: votos del
+        lado del usuario y préstamos o devoluciones ya decididos. En la primera
+        ronda vota por los pares de sus usuarios; cuando tiene los votos de
+        todos los pares de sus libros, los decide en el orden del lote.
+
+        Retorna (índices resueltos, sus mensajes, {shard: paquete}, ¿algún
+        paquete lleva votos?). Cada paquete (votos, decisiones) va ya
+        serializado: el coordinador lo reenvía sin abrirlo. Con `final` aplica
+        las decisiones del lote y lo da por terminado.
+        """
+        done = array("q")
+        messages: List[str] = []
+        outbox: Dict[int, Tuple[list, list]] = {}
+        for packet in inbox:
+            votes, decisions = pickle.loads(packet)
+            self.votes.update(votes)
+            for entry in decisions:
+                self.stage(*entry)
+        if self.user_side:
+            self._vote(outbox)
+        if self.book_side and len(self.votes) == len(self.book_side):
+            self._decide(done, messages, outbox)
+        if final:
+            self.flush()
+        asks = any(chunk[0] for chunk in outbox.values())
+        packets = {s: pickle.dumps(chunk, pickle.HIGHEST_PROTOCOL) for s, chunk in outbox.items()}
+        return done, messages, packets, asks
+
+    def abort_batch(self) -> None:
+        """Tras un error, aplica las decisiones ya recibidas y descarta el lote."""
+        self.flush()
+
+    @staticmethod
+    def _outbox(outbox: Dict[int, Tuple[list, list]], shard: int) -> Tuple[list, list]:
+        """(votos, decisiones) que se enviarán a `shard`."""
+        return outbox.get(shard) or outbox.setdefault(shard, ([], []))
+
+    def _vote(self, outbox: Dict[int, Tuple[list, list]]) -> None:
+        """Fase 1, lado del usuario: el nombre del usuario (préstamo) o cuántas
+        copias del libro tenía al empezar el lote (devolución); None si no
+        existe. Nada cambia en el usuario hasta `flush`, así que el voto es
+        válido para todo el lote."""
+        user_ids, book_ids = self.batch
+        shard_for = self.partitioner.shard_for
+        for i in self.user_side:
+            user = self.lib._find_user(user_ids[i])
+            if user is None:
+                vote = None
+            elif self.returns:
+                vote = user.borrowed.count(book_ids[i])
+            else:
+                vote = user.name
+            shard = shard_for(book_ids[i])
+            if shard == self.shard:
+                self.votes[i] = vote
+            else:
+                self._outbox(outbox, shard)[0].append((i, vote))
+        self.user_side = ()
+
+    def _decide(self, done: array, messages: List[str], outbox: Dict[int, Tuple[list, list]]) -> None:
+        """Fase 2, lado del libro: decide cada par de sus libros en el orden del
+        lote, como `Library.borrow_book` / `Library.return_book`, y envía al
+        shard de cada usuario lo que debe aplicar en su lista de préstamos.
+
+        En una devolución, las copias que tiene el usuario son las de su voto
+        más lo que ya cambiaron en este lote los pares del mismo libro, que se
+        deciden todos aquí."""
+        user_ids, book_ids = self.batch
+        votes = self.votes
+        held: Dict[Tuple[int, int], int] = {}  # (usuario, libro) -> cambio en el lote
+        for i in self.book_side:
+            user_id, book_id = user_ids[i], book_ids[i]
+            vote = votes[i]
+            book = self.lib._find_book(book_id)
+            done.append(i)
+            if vote is None or not book:
+                messages.append("Usuario o libro no encontrado.")
+            elif not self.returns:
+                messages.append(self._decide_borrow(i, user_id, vote, book, outbox))
+            elif vote + held.get((user_id, book_id), 0) == 0:
+                messages.append("El usuario no tenía este libro en préstamo.")
+            else:
+                held[user_id, book_id] = held.get((user_id, book_id), 0) - 1
+                self._send_decision(outbox, i, user_id, book_id, False)
+                next_user = self._decide_return(user_id, book)
+                if next_user is not None:
+                    held[next_user, book_id] = held.get((next_user, book_id), 0) + 1
+                    self._send_decision(outbox, i, next_user, book_id, True)
+                messages.append(_return_message(next_user))
+        self.book_side = ()
+
+    def _decide_borrow(self, txn: int, user_id: int, name: str, book: Book,
+                       outbox: Dict[int, Tuple[list, list]]) -> str:
+        if book.available():
+            book.copies -= 1
+            self.lib.history.append(Operation("borrow", user_id, book.id))
+            self._send_decision(outbox, txn, user_id, book.id, True)
+            return f"Préstamo exitoso: '{book.title}' para {name}."
+        if user_id not in book.waitlist:
+            book.waitlist.append(user_id)
+            return f"No hay copias disponibles. {name} fue agregado a la lista de espera."
+        return f"{name} ya está en la lista de espera."
+
+    def _decide_return(self, user_id: int, book: Book) -> Optional[int]:
+        """Registra la devolución y, como `Library.return_book`, presta la copia
+        al siguiente usuario en espera, a quien retorna (o None)."""
+        book.copies += 1
+        self.lib.history.append(Operation("return", user_id, book.id))
+        if not book.waitlist:
+            return None
+        next_user = book.waitlist.popleft()
+        book.copies -= 1
+        self.lib.history.append(Operation("borrow", next_user, book.id))
+        return next_user
+
+    def _send_decision(self, outbox: Dict[int, Tuple[list, list]], txn: int,
+                       user_id: int, book_id: int, lend: bool) -> None:
+        shard = self.partitioner.shard_for(user_id)
+        if shard == self.shard:
+            self.stage(txn, user_id, book_id, lend)
+        else:
+            self._outbox(outbox, shard)[1].append((txn, user_id, book_id, lend))
+
+    # Préstamos (`lend`) y devoluciones del lote pendientes de aplicar en orden
+    def stage(self, txn: int, user_id: int, book_id: int, lend: bool) -> None:
+        self.staged.setdefault(user_id, []).append((txn, lend, book_id))
+
+    def flush(self) -> None:
+        """Aplica a cada usuario las decisiones del lote en el orden del lote."""
+        for user_id, entries in self.staged.items():
+            entries.sort()
+            borrowed = self.lib._find_user(user_id).borrowed
+            for _, lend, book_id in entries:
+                if lend:
+                    borrowed.append(book_id)
+                else:
+                    borrowed.remove(book_id)
+        self.staged = {}
+        self.votes = {}
+        self.user_side = self.book_side = ()
+
+    # Consultas
+    def find_book(self, book_id: int) -> Optional[Book]:
+        return self.lib._find_book(book_id)
+
+    def find_user(self, user_id: int) -> Optional[User]:
+        return self.lib._find_user(user_id)
+
+    def list_books(self) -> List[Book]:
+        return self.lib.books
+
+    def list_users(self) -> List[User]:
+        return self.lib.users
+
+    def books_by_id(self) -> List[Book]:
+        return self.lib.book_bst.inorder()
+
+    def books_by_title(self) -> List[Book]:
+        return self.lib.book_title_bst.inorder()
+
+    def users_by_id(self) -> List[User]:
+        return self.lib.user_bst.inorder()
+
+    def search_books(self, keyword: str) -> List[Book]:
+        return self.lib.search_books(keyword)
+
+    def search_by_title_exact(self, title: str) -> Optional[Book]:
+        return self.lib.search_by_title_exact(title)
+
+    def search_by_title_prefix(self, prefix: str) -> List[Book]:
+        return self.lib.search_by_title_prefix(prefix)
+
+    # Rebalanceo
+    def export(self, partitioner: Any, shard: int) -> Tuple[List[Book], List[User]]:
+        """Quita y retorna los registros que ya no pertenecen a este shard."""
+        lib = self.lib
+        moved_books = [b for b in lib.books if partitioner.shard_for(b.id) != shard]
+        moved_users = [u for u in lib.users if partitioner.shard_for(u.id) != shard]
+        if moved_books:
+            lib.books = [b for b in lib.books if partitioner.shard_for(b.id) == shard]
+            lib.book_bst = None
+            lib.book_title_bst = None
+        if moved_users:
+            lib.users = [u for u in lib.users if partitioner.shard_for(u.id) == shard]
+            lib.user_bst = None
+        return moved_books, moved_users
+
+    def import_records(self, books: List[Book], users: List[User]) -> None:
+        lib = self.lib
+        # Se mantienen las listas ordenadas por ID (orden de alta), como en una
+        # Library sin rebalanceos; los títulos repetidos se recorren en ese orden.
+        if books:
+            lib.books.extend(books)
+            lib.books.sort(key=lambda b: b.id)
+            lib.book_bst = None  # los índices se reconstruyen balanceados al usarse
+            lib.book_title_bst = None
+        if users:
+            lib.users.extend(users)
+            lib.users.sort(key=lambda u: u.id)
+            lib.user_bst = None
+
+
+def _worker_main(conn) -> None:
+    """Bucle del proceso: recibe lotes [(op, args), ...] y responde
+    (resultados, primera excepción o None). Una operación que falla no
+    detiene el proceso: su excepción se devuelve al coordinador."""
+    worker = ShardWorker()
+    while True:
+        batch = conn.recv()
+        if batch is None:
+            break
+        results: List[Any] = []
+        error: Optional[BaseException] = None
+        for op, args in batch:
+            try:
+                results.append(getattr(worker, op)(*args))
+            except Exception as e:
+                results.append(None)
+                if error is None:
+                    error = e
+        try:
+            conn.send((results, error))
+        except Exception as e:  # resultado o excepción no serializable
+            conn.send(([None] * len(batch), RuntimeError(f"{error!r} / {e!r}")))
+    conn.close()
+
+
+# ---------- Coordinador ----------
+
+class ShardedLibrary:
+    """Coordinador que enruta operaciones a shards en procesos separados.
+
+    Los préstamos/devoluciones se pueden enviar por lotes con `borrow_many` y
+    `return_many`. Un lote produce los mismos mensajes y el mismo estado final
+    que aplicar sus pares uno a uno en una `Library`, en tres rondas como
+    máximo sin importar el tamaño del lote (ver `_run_batch`).
+    """
+    def __init__(self, num_shards: int = 2, partitioner: Any = None) -> None:
+        self.partitioner = partitioner or HashPartitioner(num_shards)
+        self.next_book_id = 1
+        self.next_user_id = 1
+        self._procs: List[Any] = []
+        self._conns: List[Any] = []
+        self._spawn(self.partitioner.num_shards)
+
+    def __enter__(self) -> "ShardedLibrary":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
+
+    @property
+    def num_shards(self) -> int:
+        return len(self._conns)
+
+    def _spawn(self, count: int) -> None:
+        for _ in range(count):
+            parent, child = mp.Pipe()
+            proc = mp.Process(target=_worker_main, args=(child,), daemon=True)
+            proc.start()
+            child.close()
+            self._procs.append(proc)
+            self._conns.append(parent)
+
+    def _stop(self, shard: int) -> None:
+        conn = self._conns.pop(shard)
+        proc = self._procs.pop(shard)
+        try:
+            conn.send(None)
+        except OSError:  # el proceso ya terminó (BrokenPipeError, etc.)
+            pass
+        conn.close()
+        proc.join(timeout=5)
+        if proc.is_alive():
+            proc.terminate()
+            proc.join()
+
+    def close(self) -> None:
+        while self._conns:
+            self._stop(len(self._conns) - 1)
+
+    def _exchange(self, batches: Dict[int, List[Tuple[str, tuple]]]) -> Dict[int, List[Any]]:
+        """Envía un lote a cada shard y luego recoge todas las respuestas (en paralelo).
+
+        Si alguna operación falló en un shard (o un shard no pudo recibir su
+        lote), la excepción se relanza aquí después de recibir las respuestas de
+        todos los shards a los que sí se envió, para no dejar respuestas viejas
+        en los canales que desincronicen las llamadas siguientes.
+        """
+        error: Optional[BaseException] = None
+        sent: List[int] = []
+        for shard, batch in batches.items():
+            try:
+                self._conns[shard].send(batch)
+            except OSError as e:  # proceso muerto (BrokenPipeError, etc.)
+                if error is None:
+                    error = RuntimeError(f"No se pudo enviar al shard {shard}: {e}")
+                continue
+            sent.append(shard)
+        replies: Dict[int, List[Any]] = {}
+        for shard in sent:
+            try:
+                results, err = self._conns[shard].recv()
+            except (EOFError, OSError):
+                results, err = [], RuntimeError(f"El proceso del shard {shard} terminó inesperadamente.")
+            replies[shard] = results
+            if error is None:
+                error = err
+        if error is not None:
+            raise error
+        return replies
+
+    def _call(self, shard: int, op: str, *args: Any) -> Any:
+        return self._exchange({shard: [(op, args)]})[shard][0]
+
+    def _broadcast(self, op: str, *args: Any) -> List[Any]:
+        replies = self._exchange({s: [(op, args)] for s in range(self.num_shards)})
+        return [replies[s][0] for s in range(self.num_shards)]
+
+    # Altas
+    def add_book(self, title: str, author: str, year: int, copies: int = 1) -> Book:
+        book_id = self.next_book_id
+        self.next_book_id += 1
+        shard = self.partitioner.shard_for(book_id)
+        return self._call(shard, "add_book", book_id, title, author, year, copies)
+
+    def add_user(self, name: str) -> User:
+        user_id = self.next_user_id
+        self.next_user_id += 1
+        return self._call(self.partitioner.shard_for(user_id), "add_user", user_id, name)
+
+    # Préstamo / devolución
+    def borrow_book(self, user_id: int, book_id: int) -> str:
+        return self.borrow_many([(user_id, book_id)])[0]
+
+    def return_book(self, user_id: int, book_id: int) -> str:
+        return self.return_many([(user_id, book_id)])[0]
+
+    def borrow_many(self, pairs: Sequence[Tuple[int, int]]) -> List[str]:
+        """Presta cada par (usuario, libro); equivale a llamar `borrow_book` en orden."""
+        return self._run_batch(pairs, returns=False)
+
+    def return_many(self, pairs: Sequence[Tuple[int, int]]) -> List[str]:
+        """Devuelve cada par (usuario, libro); equivale a llamar `return_book` en orden."""
+        return self._run_batch(pairs, returns=True)
+
+    def _run_batch(self, pairs: Sequence[Tuple[int, int]], returns: bool) -> List[str]:
+        """Ejecuta un lote con un solo mensaje por shard y ronda.
+
+        Cada shard recibe el lote una vez (`begin`) junto con los índices de
+        sus pares, enrutados en una pasada con `shards_for`. En la primera
+        ronda los shards de los usuarios votan; en la segunda los shards de los
+        libros deciden y, en la última, cada shard aplica las decisiones que
+        recibió. El coordinador sólo reenvía los paquetes entre shards sin
+        abrirlos, así que su trabajo por par no depende del número de shards
+        ni de cuántos pares sean cruzados.
+        """
+        results: List[Optional[str]] = [None] * len(pairs)
+        if not pairs:
+            return results  # type: ignore[return-value]
+        user_ids = array("q", [user_id for user_id, _ in pairs])
+        book_ids = array("q", [book_id for _, book_id in pairs])
+        user_shards = self.partitioner.shards_for(user_ids)
+        book_shards = self.partitioner.shards_for(book_ids)
+        user_side: List[List[int]] = [[] for _ in range(self.num_shards)]
+        book_side: List[List[int]] = [[] for _ in range(self.num_shards)]
+        for i, (us, bs) in enumerate(zip(user_shards, book_shards)):
+            user_side[us].append(i)
+            book_side[bs].append(i)
+        involved = {s for s in range(self.num_shards) if user_side[s] or book_side[s]}
+        touched = set(involved)
+        # Sin pares cruzados todo se decide en la primera ronda; en devoluciones
+        # aún puede haber préstamos automáticos a usuarios de otros shards.
+        final = user_shards == book_shards and (not returns or self.num_shards == 1)
+        begins = {s: ("begin", (s, self.partitioner, returns, array("q", user_side[s]),
+                                array("q", book_side[s]), user_ids, book_ids)) for s in involved}
+        targets = involved
+        inbox: Dict[int, List[bytes]] = {}
+        while True:
+            batches = {s: [("step", (inbox.get(s, []), final))] for s in (touched if final else targets)}
+            for s, begin in begins.items():
+                batches[s].insert(0, begin)
+            begins = {}
+            replies = self._send_step(batches)
+            inbox = {}
+            asks = False  # ¿se enviaron votos que aún hay que decidir?
+            for reply in replies.values():
+                done, messages, packets, shard_asks = reply[-1]
+                for i, message in zip(done, messages):
+                    results[i] = message
+                for dest, packet in packets.items():
+                    inbox.setdefault(dest, []).append(packet)
+                    touched.add(dest)
+                asks = asks or shard_asks
+            if final:
+                return results  # type: ignore[return-value]
+            # Es la última ronda si lo recibido sólo son decisiones
+            final = not asks
+            targets = set(inbox)
+
+    def _send_step(self, batches: Dict[int, List[Tuple[str, tuple]]]) -> Dict[int, List[Any]]:
+        """Envía una ronda del lote. Si falla en algún shard, descarta el lote en
+        todos y aplica las decisiones ya recibidas antes de relanzar la
+        excepción."""
+        try:
+            return self._exchange(batches)
+        except Exception:
+            try:
+                self._exchange({s: [("abort_batch", ())] for s in range(self.num_shards)})
+            except Exception:
+                pass  # se informa el error original
+            raise
+
+    # Consultas (fan-out a todos los shards)
+    def _all_books(self) -> List[Book]:
+        books = [b for part in self._broadcast("list_books") for b in part]
+        return sorted(books, key=lambda b: b.id)
+
+    def _all_users(self) -> List[User]:
+        users = [u for part in self._broadcast("list_users") for u in part]
+        return sorted(users, key=lambda u: u.id)
+
+    def find_book(self, book_id: int) -> Optional[Book]:
+        return self._call(self.partitioner.shard_for(book_id), "find_book", book_id)
+
+    def find_user(self, user_id: int) -> Optional[User]:
+        return self._call(self.partitioner.shard_for(user_id), "find_user", user_id)
+
+    def search_books(self, keyword: str) -> List[Book]:
+        books = [b for part in self._broadcast("search_books", keyword) for b in part]
+        return sorted(books, key=lambda b: b.id)
+
+    def search_by_title_exact(self, title: str) -> Optional[Book]:
+        matches = [b for b in self._broadcast("search_by_title_exact", title) if b is not None]
+        return min(matches, key=lambda b: b.id) if matches else None
+
+    def search_by_title_prefix(self, prefix: str) -> List[Book]:
+        books = [b for part in self._broadcast("search_by_title_prefix", prefix) for b in part]
+        return sorted(books, key=lambda b: (b.title.lower(), b.id))
+
+    def list_books(self) -> str:
+        books = self._all_books()
+        if not books: return "Sin libros."
+        lines = []
+        for b in books:
+            lines.append(f"[{b.id}] {b.title} - {b.author} ({b.year}) | copias: {b.copies} | espera: {list(b.waitlist)}")
+        return "\n".join(lines)
+
+    def list_users(self) -> str:
+        users = self._all_users()
+        if not users: return "Sin usuarios."
+        lines = []
+        for u in users:
+            lines.append(f"[{u.id}] {u.name} | prestados: {u.borrowed}")
+        return "\n".join(lines)
+
+    def list_books_ordered_by_id(self) -> str:
+        """Combina los recorridos inorden (por ID) de cada shard."""
+        books = list(heapq.merge(*self._broadcast("books_by_id"), key=lambda b: b.id))
+        if not books: return "Sin libros."
+        lines = []
+        for b in books:
+            lines.append(f"[{b.id}] {b.title} - {b.author} ({b.year}) | copias: {b.copies}")
+        return "\n".join(lines)
+
+    def list_books_ordered_by_title(self) -> str:
+        """Combina los recorridos inorden (por título) de cada shard.
+
+        Con títulos repetidos cada shard los recorre por ID (orden de alta), y
+        el desempate por ID conserva ese orden al combinarlos.
+        """
+        books = list(heapq.merge(*self._broadcast("books_by_title"), key=lambda b: (b.title.lower(), b.id)))
+        if not books: return "Sin libros."
+        lines = []
+        for b in books:
+            lines.append(f"[{b.id}] {b.title} - {b.author} ({b.year}) | copias: {b.copies}")
+        return "\n".join(lines)
+
+    def list_users_ordered(self) -> str:
+        """Combina los recorridos inorden (por ID) de usuarios de cada shard."""
+        users = list(heapq.merge(*self._broadcast("users_by_id"), key=lambda u: u.id))
+        if not users: return "Sin usuarios."
+        lines = []
+        for u in users:
+            lines.append(f"[{u.id}] {u.name} | prestados: {u.borrowed}")
+        return "\n".join(lines)
+
+    # Rebalanceo
+    def rebalance(self, partitioner: Any) -> int:
+        """Redistribuye libros y usuarios según un nuevo particionador.
+
+        Crea o detiene procesos según el nuevo número de shards y retorna la
+        cantidad de registros movidos.
+        """
+        old_count = self.num_shards
+        if partitioner.num_shards > old_count:
+            self._spawn(partitioner.num_shards - old_count)
+        exported = self._broadcast_indexed("export", partitioner)
+
+        incoming: Dict[int, Tuple[List[Book], List[User]]] = {}
+        moved = 0
+        for books, users in exported:
+            for b in books:
+                incoming.setdefault(partitioner.shard_for(b.id), ([], []))[0].append(b)
+            for u in users:
+                incoming.setdefault(partitioner.shard_for(u.id), ([], []))[1].append(u)
+            moved += len(books) + len(users)
+        if incoming:
+            self._exchange({s: [("import_records", recs)] for s, recs in incoming.items()})
+
+        while self.num_shards > partitioner.num_shards:
+            self._stop(self.num_shards - 1)
+        self.partitioner = partitioner
+        return moved
+
+    def _broadcast_indexed(self, op: str, *args: Any) -> List[Any]:
+        """Como `_broadcast`, pero agrega el índice del shard como último argumento."""
+        replies = self._exchange({s: [(op, args + (s,))] for s in range(self.num_shards)})
+        return [replies[s][0] for s in range(self.num_shards)]
@@ -176,31 +176,38 @@ class BookTitleBST:
                 cur = cur.right
 
     def search_by_title(self, title: str) -> Optional[Book]:
-        """Búsqueda exacta por título."""
+        """Búsqueda exacta por título; con títulos repetidos retorna el primero
+        en recorrido inorden (el agregado primero)."""
         cur = self.root
         title_lower = title.lower()
+        found: Optional[Book] = None
         while cur:
             if title_lower == cur.book.title.lower():
-                return cur.book
+                found = cur.book
+                cur = cur.left  # puede haber un título igual más a la izquierda
             elif title_lower < cur.book.title.lower():
                 cur = cur.left
             else:
                 cur = cur.right
-        return None
+        return found
 
     def search_prefix(self, prefix: str) -> List[Book]:
-        """Búsqueda por prefijo: devuelve todos los libros cuyo título comienza con el prefijo."""
+        """Búsqueda por prefijo: devuelve, en orden alfabético, todos los libros
+        cuyo título comienza con el prefijo."""
         results: List[Book] = []
         prefix_lower = prefix.lower()
         
         def _search(node: Optional[BookTitleNode]):
             if not node:
                 return
-            if node.book.title.lower().startswith(prefix_lower):
-                results.append(node.book)
-            if prefix_lower <= node.book.title.lower():
+            title = node.book.title.lower()
+            if prefix_lower <= title:
                 _search(node.left)
-            _search(node.right)
+            if title.startswith(prefix_lower):
+                results.append(node.book)
+            # A la derecha sólo hay títulos >= a éste: si ya pasó el prefijo, no hay más
+            if title < prefix_lower or title.startswith(prefix_lower):
+                _search(node.right)
         
         _search(self.root)
         return results
@@ -281,9 +288,62 @@ class Library:
         self.undo_stack: List[Operation] = []  # Pila (LIFO) para deshacer
         self.next_book_id = 1                  # "Arreglo" implícito de IDs
         self.next_user_id = 1
-        self.book_bst = BookBST()              # Búsqueda por ID de libro
-        self.book_title_bst = BookTitleBST()   # Búsqueda por título de libro
-        self.user_bst = UserBST()              # Búsqueda por ID de usuario
+        # Índices BST construidos bajo demanda (ver propiedades más abajo)
+        self._book_bst: Optional[BookBST] = None             # Búsqueda por ID de libro
+        self._book_title_bst: Optional[BookTitleBST] = None  # Búsqueda por título de libro
+        self._user_bst: Optional[UserBST] = None             # Búsqueda por ID de usuario
+
+    # Índices perezosos: sólo se construyen la primera vez que se usan, de modo
+    # que cargar datos para un comando que no los necesita no paga su costo.
+    @staticmethod
+    def _build_balanced(node_cls, items: list, key):
+        """Construye un árbol balanceado enlazando los nodos desde la lista
+        ordenada (orden estable): con claves repetidas, el recorrido inorden
+        conserva el orden de `items`."""
+        ordered = sorted(items, key=key)
+
+        def _link(lo: int, hi: int):
+            if lo > hi:
+                return None
+            mid = (lo + hi) // 2
+            node = node_cls(ordered[mid])
+            node.left = _link(lo, mid - 1)
+            node.right = _link(mid + 1, hi)
+            return node
+        return _link(0, len(ordered) - 1)
+
+    @property
+    def book_bst(self) -> BookBST:
+        if self._book_bst is None:
+            self._book_bst = BookBST()
+            self._book_bst.root = self._build_balanced(BookNode, self.books, lambda b: b.id)
+        return self._book_bst
+
+    @book_bst.setter
+    def book_bst(self, tree: Optional[BookBST]) -> None:
+        self._book_bst = tree
+
+    @property
+    def book_title_bst(self) -> BookTitleBST:
+        if self._book_title_bst is None:
+            self._book_title_bst = BookTitleBST()
+            self._book_title_bst.root = self._build_balanced(BookTitleNode, self.books, lambda b: b.title.lower())
+        return self._book_title_bst
+
+    @book_title_bst.setter
+    def book_title_bst(self, tree: Optional[BookTitleBST]) -> None:
+        self._book_title_bst = tree
+
+    @property
+    def user_bst(self) -> UserBST:
+        if self._user_bst is None:
+            self._user_bst = UserBST()
+            self._user_bst.root = self._build_balanced(UserNode, self.users, lambda u: u.id)
+        return self._user_bst
+
+    @user_bst.setter
+    def user_bst(self, tree: Optional[UserBST]) -> None:
+        self._user_bst = tree
 
     # Utilidades
     def _find_book(self, book_id: int) -> Optional[Book]:
@@ -296,8 +356,11 @@ class Library:
     def add_book(self, title: str, author: str, year: int, copies: int = 1) -> Book:
         book = Book(self.next_book_id, title, author, year, copies)
         self.books.append(book)
-        self.book_bst.insert(book)
-        self.book_title_bst.insert(book)
+        # Si el índice aún no existe se construirá completo al usarse
+        if self._book_bst is not None:
+            self._book_bst.insert(book)
+        if self._book_title_bst is not None:
+            self._book_title_bst.insert(book)
         self.next_book_id += 1
         return book
 
@@ -313,6 +376,7 @@ class Library:
         
         self.books = [b for b in self.books if b.id != book_id]
         self.book_bst.delete(book_id)
+        self.book_title_bst = None  # BookTitleBST no tiene delete: se reconstruye al usarse
         return f"Libro '{book.title}' eliminado del sistema."
 
     def search_books(self, keyword: str) -> List[Book]:
@@ -331,7 +395,8 @@ class Library:
     def add_user(self, name: str) -> User:
         user = User(self.next_user_id, name)
         self.users.append(user)
-        self.user_bst.insert(user)
+        if self._user_bst is not None:
+            self._user_bst.insert(user)
         self.next_user_id += 1
         return user
 
@@ -484,9 +549,10 @@ class Library:
             self.users = []
             self.history = []
             self.undo_stack = []
-            self.book_bst = BookBST()
-            self.book_title_bst = BookTitleBST()
-            self.user_bst = UserBST()
+            # Los índices se reconstruyen (balanceados) sólo cuando se necesiten
+            self.book_bst = None
+            self.book_title_bst = None
+            self.user_bst = None
             
             for book_data in data.get("books", []):
                 book = Book(
@@ -498,8 +564,6 @@ class Library:
                     waitlist=deque(book_data.get("waitlist", []))
                 )
                 self.books.append(book)
-                self.book_bst.insert(book)
-                self.book_title_bst.insert(book)
             
             for user_data in data.get("users", []):
                 user = User(
@@ -508,7 +572,6 @@ class Library:
                     borrowed=user_data.get("borrowed", [])
                 )
                 self.users.append(user)
-                self.user_bst.insert(user)
             
             self.next_book_id = data.get("next_book_id", 1)
             self.next_user_id = data.get("next_user_id", 1)